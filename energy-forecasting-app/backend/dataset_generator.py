@@ -1,12 +1,29 @@
 import pandas as pd
 import numpy as np
 import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
+
+SEASONS = ('winter', 'spring', 'summer', 'autumn')
+
+# Index into SEASONS for each month (position 0 unused)
+_SEASON_IDX_BY_MONTH = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+_SEASON_NAMES = np.array(SEASONS)
+_SEASON_BY_MONTH = _SEASON_NAMES[_SEASON_IDX_BY_MONTH]
+
+# Major holidays (simplified), as (month, day)
+HOLIDAYS = {
+    (1, 1),   # New Year
+    (7, 4),   # Independence Day
+    (12, 25), # Christmas
+}
+# Same holidays encoded as month * 100 + day for vectorized lookup
+HOLIDAY_CODES = np.array(sorted(month * 100 + day for month, day in HOLIDAYS), dtype=np.int32)
 
 class EnergyDatasetGenerator:
     """Generate realistic energy consumption datasets based on real patterns"""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = np.random.default_rng(seed)
         self.seasonal_patterns = {
             'winter': {'base': 100, 'amplitude': 40, 'peak_hours': [7, 8, 18, 19, 20]},
             'spring': {'base': 70, 'amplitude': 25, 'peak_hours': [7, 8, 18, 19]},
@@ -16,63 +33,72 @@ class EnergyDatasetGenerator:
     
     def get_season(self, month: int) -> str:
         """Determine season based on month"""
-        if month in [12, 1, 2]:
-            return 'winter'
-        elif month in [3, 4, 5]:
-            return 'spring'
-        elif month in [6, 7, 8]:
-            return 'summer'
-        else:
-            return 'autumn'
+        return SEASONS[_SEASON_IDX_BY_MONTH[month]]
+    
+    def season_index(self, month: np.ndarray) -> np.ndarray:
+        """Vectorized get_season, returning indices into SEASONS"""
+        return _SEASON_IDX_BY_MONTH[month]
     
     def generate_hourly_data(self, start_date: str, days: int = 30) -> pd.DataFrame:
         """Generate hourly energy consumption data"""
-        start = datetime.datetime.strptime(start_date, '%Y-%m-%d')
-        dates = [start + datetime.timedelta(hours=i) for i in range(days * 24)]
+        return pd.DataFrame(self.generate_hourly_columns(start_date, days))
+    
+    def generate_hourly_columns(self, start_date: Union[str, pd.Timestamp], days: int = 30) -> Dict[str, np.ndarray]:
+        """Generate hourly energy consumption data as a dict of column arrays"""
+        # Calendar fields straight from the DatetimeIndex, as narrow int arrays
+        timestamps = pd.date_range(start_date, periods=days * 24, freq='h')
+        hour = timestamps.hour.to_numpy(dtype=np.int8)
+        weekday = timestamps.weekday.to_numpy(dtype=np.int8)
+        month = timestamps.month.to_numpy(dtype=np.int8)
+        n = len(timestamps)
+        
+        season_idx = self.season_index(month)
+        patterns = [self.seasonal_patterns[season] for season in SEASONS]
+        base = np.array([pattern['base'] for pattern in patterns], dtype=np.float64)
+        amplitude = np.array([pattern['amplitude'] for pattern in patterns], dtype=np.float64)
+        peak_table = np.zeros((len(SEASONS), 24), dtype=bool)
+        for i, pattern in enumerate(patterns):
+            peak_table[i, pattern['peak_hours']] = True
+        
+        # Base consumption
+        consumption = base[season_idx]
         
-        data = []
-        for dt in dates:
-            season = self.get_season(dt.month)
-            pattern = self.seasonal_patterns[season]
-            
-            # Base consumption
-            consumption = pattern['base']
-            
-            # Daily pattern
-            if dt.hour in pattern['peak_hours']:
-                consumption += pattern['amplitude'] * 0.8
-            elif dt.hour in [22, 23, 0, 1, 2, 3, 4, 5]:
-                consumption *= 0.6  # Night reduction
-            
-            # Weekly pattern
-            if dt.weekday() >= 5:  # Weekend
-                consumption *= 0.75
-            
-            # Add random noise
-            consumption += np.random.normal(0, consumption * 0.1)
-            
-            # Weather effect simulation
-            if season == 'summer' and dt.hour in [12, 13, 14, 15]:
-                consumption += np.random.normal(20, 5)  # AC usage
-            elif season == 'winter' and dt.hour in [6, 7, 8, 17, 18, 19]:
-                consumption += np.random.normal(15, 3)  # Heating
-            
-            data.append({
-                'timestamp': dt,
-                'consumption': max(0, consumption),
-                'hour': dt.hour,
-                'day_of_week': dt.weekday(),
-                'day_of_year': dt.timetuple().tm_yday,
-                'month': dt.month,
-                'season': season,
-                'temperature': self.simulate_temperature(dt),
-                'humidity': np.random.uniform(30, 80),
-                'is_holiday': self.is_holiday(dt)
-            })
+        # Daily pattern
+        is_peak = peak_table[season_idx, hour]
+        is_night = np.isin(hour, [22, 23, 0, 1, 2, 3, 4, 5])
+        consumption = np.where(
+            is_peak,
+            consumption + amplitude[season_idx] * 0.8,
+            np.where(is_night, consumption * 0.6, consumption)  # Night reduction
+        )
         
-        return pd.DataFrame(data)
+        # Weekly pattern
+        consumption *= np.where(weekday >= 5, 0.75, 1.0)  # Weekend
+        
+        # Add random noise
+        consumption += self._rng.standard_normal(n) * consumption * 0.1
+        
+        # Weather effect simulation
+        ac_usage = (season_idx == 2) & np.isin(hour, [12, 13, 14, 15])
+        heating = (season_idx == 0) & np.isin(hour, [6, 7, 8, 17, 18, 19])
+        consumption[ac_usage] += self._rng.normal(20, 5, np.count_nonzero(ac_usage))
+        consumption[heating] += self._rng.normal(15, 3, np.count_nonzero(heating))
+        
+        return {
+            'timestamp': timestamps,
+            'consumption': np.maximum(0, consumption),
+            'hour': hour,
+            'day_of_week': weekday,
+            'day_of_year': timestamps.dayofyear.to_numpy(dtype=np.int16),
+            'month': month,
+            'season': _SEASON_BY_MONTH[month],
+            'temperature': self.simulate_temperature(timestamps, hour=hour, season_idx=season_idx),
+            'humidity': self._rng.uniform(30, 80, n),
+            'is_holiday': self.holiday_mask(timestamps)
+        }
     
-    def simulate_temperature(self, dt: datetime.datetime) -> float:
+    def simulate_temperature(self, timestamps: pd.DatetimeIndex, hour: Optional[np.ndarray] = None,
+                             season_idx: Optional[np.ndarray] = None) -> np.ndarray:
         """Simulate temperature based on season and time"""
         season_temps = {
             'winter': {'base': 5, 'range': 10},
@@ -80,47 +106,64 @@ class EnergyDatasetGenerator:
             'summer': {'base': 25, 'range': 10},
             'autumn': {'base': 12, 'range': 8}
         }
-        season = self.get_season(dt.month)
-        temp_config = season_temps[season]
+        if hour is None:
+            hour = timestamps.hour.to_numpy()
+        if season_idx is None:
+            season_idx = self.season_index(timestamps.month.to_numpy())
+        base = np.array([season_temps[season]['base'] for season in SEASONS], dtype=np.float64)[season_idx]
+        spread = np.array([season_temps[season]['range'] for season in SEASONS], dtype=np.float64)[season_idx]
         
         # Daily temperature variation
-        daily_variation = 5 * np.sin(2 * np.pi * (dt.hour - 6) / 24)
-        base_temp = temp_config['base'] + np.random.uniform(-temp_config['range']/2, temp_config['range']/2)
+        daily_variation = 5 * np.sin(2 * np.pi * (hour - 6) / 24)
+        base_temp = base + self._rng.uniform(-spread/2, spread/2)
         
         return base_temp + daily_variation
     
     def is_holiday(self, dt: datetime.datetime) -> bool:
         """Simple holiday detection"""
-        # Major holidays (simplified)
-        holidays = [
-            (1, 1),   # New Year
-            (7, 4),   # Independence Day
-            (12, 25), # Christmas
-        ]
-        return (dt.month, dt.day) in holidays
+        return (dt.month, dt.day) in HOLIDAYS
+    
+    def holiday_mask(self, timestamps: pd.DatetimeIndex) -> np.ndarray:
+        """Vectorized is_holiday over a DatetimeIndex"""
+        code = timestamps.month.to_numpy(dtype=np.int32) * 100 + timestamps.day.to_numpy(dtype=np.int32)
+        return np.isin(code, HOLIDAY_CODES)
     
     def generate_multiple_algorithms_data(self, hours: int = 168) -> Dict:
         """Generate data suitable for multiple forecasting algorithms"""
-        end_date = datetime.datetime.now()
-        start_date = end_date - datetime.timedelta(hours=hours)
+        start_date = (pd.Timestamp.now() - pd.Timedelta(hours=hours)).normalize()
+        
+        columns = self.generate_hourly_columns(start_date, days=hours//24 + 1)
+        columns = {name: values[:hours] for name, values in columns.items()}  # Ensure exact hours
+        consumption = columns['consumption']
         
-        df = self.generate_hourly_data(start_date.strftime('%Y-%m-%d'), days=hours//24 + 1)
-        df = df.head(hours)  # Ensure exact hours
+        # Grouped means via bincount rather than a pandas groupby
+        hour_counts = np.bincount(columns['hour'], minlength=24)
+        hour_sums = np.bincount(columns['hour'], weights=consumption, minlength=24)
+        hour_means = np.where(hour_counts > 0, hour_sums / np.maximum(hour_counts, 1), -np.inf)
+        n_peaks = min(5, np.count_nonzero(hour_counts))
+        top = np.argpartition(-hour_means, n_peaks - 1)[:n_peaks]
+        peak_hours = top[np.argsort(-hour_means[top], kind='stable')]
+        season_idx = self.season_index(columns['month'])
+        season_counts = np.bincount(season_idx, minlength=len(SEASONS))
+        season_sums = np.bincount(season_idx, weights=consumption, minlength=len(SEASONS))
         
         # Prepare data for different algorithms
         return {
-            'historical_data': df.to_dict('records'),
+            'historical_data': columns,
             'statistics': {
-                'mean_consumption': df['consumption'].mean(),
-                'std_consumption': df['consumption'].std(),
-                'min_consumption': df['consumption'].min(),
-                'max_consumption': df['consumption'].max(),
-                'peak_hours': df.groupby('hour')['consumption'].mean().nlargest(5).index.tolist(),
-                'seasonal_averages': df.groupby('season')['consumption'].mean().to_dict()
+                'mean_consumption': consumption.mean(),
+                'std_consumption': consumption.std(ddof=1),
+                'min_consumption': consumption.min(),
+                'max_consumption': consumption.max(),
+                'peak_hours': peak_hours.tolist(),
+                'seasonal_averages': {
+                    SEASONS[i]: season_sums[i] / season_counts[i]
+                    for i in np.flatnonzero(season_counts)
+                }
             },
             'correlations': {
-                'temperature_correlation': df['consumption'].corr(df['temperature']),
-                'humidity_correlation': df['consumption'].corr(df['humidity'])
+                'temperature_correlation': np.corrcoef(consumption, columns['temperature'])[0, 1],
+                'humidity_correlation': np.corrcoef(consumption, columns['humidity'])[0, 1]
             }
         }
 
@@ -1,110 +1,189 @@
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Tuple
-from scipy import stats
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
-import math
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Sequence, Union
+import numba as nb
+
+# Feature columns used by linear_regression_forecast, in order
+LR_FEATURES = ['hour', 'day_of_week', 'day_of_year', 'temperature', 'humidity']
+
+# Ensemble members, in the order their predictions are stored, and their weights
+# (based on recent performance, simplified)
+ENSEMBLE_METHODS = ('moving_average', 'exponential_smoothing', 'holt_winters',
+                    'arima', 'linear_regression', 'seasonal_decomposition')
+ENSEMBLE_WEIGHTS = np.array([0.15, 0.20, 0.25, 0.05, 0.20, 0.15])
+
+# Kernels are compiled for both writable and read-only (e.g. pandas-backed) inputs
+_ARRAY_TYPES = (nb.float64[::1], nb.types.Array(nb.float64, 1, 'C', readonly=True))
+
+@nb.njit([nb.float64(arr, nb.float64) for arr in _ARRAY_TYPES], cache=True, fastmath=True)
+def _ses(data, alpha):
+    """Simple exponential smoothing recursion"""
+    result = data[0]
+    for i in range(1, len(data)):
+        result = alpha * data[i] + (1 - alpha) * result
+    return result
+
+
+@nb.njit([nb.float64(arr, nb.int64, nb.int64) for arr in _ARRAY_TYPES], cache=True, fastmath=True)
+def _ar(data, p, d):
+    """AR(p) tap sum on the d-times differenced series, added back to the last value"""
+    # Difference in place on a single scratch buffer
+    n = len(data)
+    diff = data.copy()
+    for _ in range(d):
+        n -= 1
+        for j in range(n):
+            diff[j] = diff[j + 1] - diff[j]
+    
+    ar_prediction = 0.0
+    for i in range(1, min(p, n) + 1):
+        ar_prediction += 0.5 ** i * diff[n - i]
+    
+    return data[-1] + ar_prediction
+
+
+@nb.njit([nb.float64(arr, nb.int64, nb.float64, nb.float64, nb.float64) for arr in _ARRAY_TYPES],
+         cache=True, fastmath=True)
+def _hw_kernel(data, season_length, alpha, beta, gamma):
+    """Holt-Winters recursion, compiled to avoid per-step interpreter overhead"""
+    level = data[:season_length].mean()
+    trend = (data[season_length:2*season_length].mean() - level) / season_length
+    seasonal = np.empty(season_length)
+    for i in range(season_length):
+        seasonal[i] = data[i] - level
+    
+    for i in range(season_length, len(data)):
+        s = i % season_length
+        prev_level = level
+        level = alpha * (data[i] - seasonal[s]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        seasonal[s] = gamma * (data[i] - level) + (1 - gamma) * seasonal[s]
+    
+    return level + trend + seasonal[0]
+
+
+@dataclass
+class _PreprocBundle:
+    """Consumption series shared by the ensemble members, with cached derived values"""
+    arr: np.ndarray  # contiguous float64
+    
+    @classmethod
+    def of(cls, data) -> "_PreprocBundle":
+        if isinstance(data, cls):
+            return data
+        return cls(np.ascontiguousarray(data, dtype=np.float64))
+    
+    def __len__(self) -> int:
+        return len(self.arr)
+    
+    @cached_property
+    def mean(self) -> float:
+        return self.arr.mean()
+    
+    @cached_property
+    def csum(self) -> np.ndarray:
+        """Prefix sums with a leading zero, so csum[j] - csum[i] == arr[i:j].sum()"""
+        return np.concatenate(([0.0], np.cumsum(self.arr)))
+
+
+# Consumption series accepted by the single-series methods
+SeriesLike = Union[Sequence[float], np.ndarray, _PreprocBundle]
+
 
 class EnergyForecastingAlgorithms:
     """Collection of energy forecasting algorithms"""
     
-    def __init__(self):
-        self.scaler = StandardScaler()
+    def warmup(self):
+        """Run the ensemble once on synthetic data so Numba start-up costs are paid before the first request"""
+        n = 72
+        hours = np.arange(n)
+        consumption = 50 + 10 * np.sin(2 * np.pi * hours / 24)
+        features = np.zeros((n, len(LR_FEATURES)))
+        features[:, 0] = hours % 24
+        self.ensemble_forecast(consumption, features)
     
-    def moving_average(self, data: List[float], window: int = 24) -> float:
+    def moving_average(self, data: SeriesLike, window: int = 24) -> float:
         """Simple moving average forecast"""
-        if len(data) < window:
-            return np.mean(data)
-        return np.mean(data[-window:])
+        return _PreprocBundle.of(data).arr[-window:].mean()
     
-    def exponential_smoothing(self, data: List[float], alpha: float = 0.3) -> float:
+    def exponential_smoothing(self, data: SeriesLike, alpha: float = 0.3) -> float:
         """Exponential smoothing forecast"""
-        if not data:
+        series = _PreprocBundle.of(data)
+        if len(series) == 0:
             return 0
         
-        result = data[0]
-        for value in data[1:]:
-            result = alpha * value + (1 - alpha) * result
-        return result
+        return _ses(series.arr, alpha)
     
-    def holt_winters(self, data: List[float], season_length: int = 24, alpha: float = 0.3, 
+    def holt_winters(self, data: SeriesLike, season_length: int = 24, alpha: float = 0.3, 
                      beta: float = 0.1, gamma: float = 0.1) -> float:
         """Holt-Winters triple exponential smoothing"""
-        if len(data) < season_length * 2:
-            return self.exponential_smoothing(data, alpha)
+        series = _PreprocBundle.of(data)
+        if len(series) < season_length * 2:
+            return self.exponential_smoothing(series, alpha)
         
-        # Initialize components
-        level = np.mean(data[:season_length])
-        trend = (np.mean(data[season_length:2*season_length]) - np.mean(data[:season_length])) / season_length
-        seasonal = [data[i] - level for i in range(season_length)]
-        
-        # Apply Holt-Winters
-        for i in range(season_length, len(data)):
-            prev_level = level
-            level = alpha * (data[i] - seasonal[i % season_length]) + (1 - alpha) * (level + trend)
-            trend = beta * (level - prev_level) + (1 - beta) * trend
-            seasonal[i % season_length] = gamma * (data[i] - level) + (1 - gamma) * seasonal[i % season_length]
-        
-        return level + trend + seasonal[0]
+        return _hw_kernel(series.arr, season_length, alpha, beta, gamma)
     
-    def linear_regression_forecast(self, df: pd.DataFrame) -> Dict:
-        """Linear regression with multiple features"""
-        if len(df) < 10:
-            return {'prediction': df['consumption'].mean(), 'confidence': 0.5}
+    def linear_regression_forecast(self, X: np.ndarray, y: np.ndarray) -> Dict:
+        """Linear regression with multiple features (X columns ordered as LR_FEATURES)"""
+        if len(y) < 10:
+            return {'prediction': y.mean(), 'confidence': 0.5}
         
         # Prepare features
-        features = ['hour', 'day_of_week', 'day_of_year', 'temperature', 'humidity']
-        X = df[features].fillna(df[features].mean())
-        y = df['consumption']
+        X = np.where(np.isnan(X), np.nanmean(X, axis=0), X)
         
-        # Fit model
-        model = LinearRegression()
-        model.fit(X, y)
+        # Fit model via the normal equations on centered data; lstsq on the small
+        # Gram matrix gives zero weight to constant features instead of failing
+        X_mean = X.mean(axis=0)
+        y_mean = y.mean()
+        Xc = X - X_mean
+        coef = np.linalg.lstsq(Xc.T @ Xc, Xc.T @ (y - y_mean), rcond=None)[0]
+        intercept = y_mean - X_mean @ coef
         
         # Predict next hour
-        last_row = X.iloc[-1:].copy()
-        last_row['hour'] = (last_row['hour'] + 1) % 24
+        last_row = X[-1].copy()
+        last_row[0] = (last_row[0] + 1) % 24  # hour
         
-        prediction = model.predict(last_row)[0]
+        prediction = intercept + last_row @ coef
         
         # Calculate R² as confidence measure
-        confidence = model.score(X, y)
+        ss_res = ((y - (intercept + X @ coef)) ** 2).sum()
+        ss_tot = ((y - y_mean) ** 2).sum()
+        confidence = 1 - ss_res / ss_tot if ss_tot > 0 else float(ss_res == 0)
         
         return {
             'prediction': max(0, prediction),
             'confidence': confidence,
-            'feature_importance': dict(zip(features, model.coef_))
+            'feature_importance': dict(zip(LR_FEATURES, coef))
         }
     
-    def seasonal_decomposition_forecast(self, data: List[float], period: int = 24) -> Dict:
+    def seasonal_decomposition_forecast(self, data: SeriesLike, period: int = 24) -> Dict:
         """Seasonal decomposition forecast"""
-        if len(data) < period * 3:
-            return {'prediction': np.mean(data), 'trend': 0, 'seasonal': 0}
+        series = _PreprocBundle.of(data)
+        if len(series) < period * 3:
+            return {'prediction': series.mean, 'trend': 0, 'seasonal': 0}
         
-        data_array = np.array(data)
+        data_array = series.arr
         
-        # Calculate trend using moving average
-        trend = []
-        for i in range(len(data_array)):
-            start = max(0, i - period//2)
-            end = min(len(data_array), i + period//2 + 1)
-            trend.append(np.mean(data_array[start:end]))
-        
-        trend = np.array(trend)
+        # Calculate trend using a centered moving average (truncated at the edges)
+        n = len(data_array)
+        half = period // 2
+        csum = series.csum
+        idx = np.arange(n)
+        start = np.maximum(0, idx - half)
+        end = np.minimum(n, idx + half + 1)
+        trend = (csum[end] - csum[start]) / (end - start)
         
         # Remove trend to get seasonal + noise
         detrended = data_array - trend
         
-        # Calculate seasonal component
-        seasonal = np.zeros(period)
-        for i in range(period):
-            seasonal_values = detrended[i::period]
-            seasonal[i] = np.mean(seasonal_values) if len(seasonal_values) > 0 else 0
+        # Calculate seasonal component as the mean per phase
+        phase = idx % period
+        seasonal = np.bincount(phase, weights=detrended, minlength=period) / np.bincount(phase, minlength=period)
         
         # Forecast
         next_trend = trend[-1] + (trend[-1] - trend[-2]) if len(trend) > 1 else trend[-1]
-        next_seasonal = seasonal[len(data) % period]
+        next_seasonal = seasonal[n % period]
         
         prediction = next_trend + next_seasonal
         
@@ -115,75 +194,53 @@ class EnergyForecastingAlgorithms:
             'trend_direction': 'increasing' if len(trend) > 1 and trend[-1] > trend[-2] else 'decreasing'
         }
     
-    def arima_simple(self, data: List[float], p: int = 1, d: int = 1, q: int = 1) -> float:
+    def arima_simple(self, data: SeriesLike, p: int = 1, d: int = 1, q: int = 1) -> float:
         """Simplified ARIMA implementation"""
-        if len(data) < max(p, q) + d:
-            return np.mean(data)
-        
-        # Differencing
-        diff_data = data
-        for _ in range(d):
-            diff_data = np.diff(diff_data)
+        series = _PreprocBundle.of(data)
+        if len(series) < max(p, q) + d:
+            return series.mean
         
-        if len(diff_data) < max(p, q):
-            return data[-1]
-        
-        # Simple AR component
-        ar_prediction = 0
-        for i in range(1, min(p + 1, len(diff_data) + 1)):
-            ar_prediction += 0.5 ** i * diff_data[-i]
-        
-        # Add back differences
-        prediction = data[-1] + ar_prediction
+        # Differencing + simple AR component, added back onto the last value
+        prediction = _ar(series.arr, p, d)
         
         return max(0, prediction)
     
-    def ensemble_forecast(self, df: pd.DataFrame) -> Dict:
-        """Ensemble of multiple algorithms"""
-        consumption_data = df['consumption'].tolist()
+    def ensemble_forecast(self, consumption_data: np.ndarray, features: np.ndarray) -> Dict:
+        """Ensemble of multiple algorithms (features columns ordered as LR_FEATURES)"""
+        # Convert once and share the series across all algorithms
+        series = _PreprocBundle.of(consumption_data)
         
-        # Get predictions from different algorithms
-        predictions = {}
+        # Get predictions from different algorithms, in ENSEMBLE_METHODS order
+        preds = np.empty(len(ENSEMBLE_METHODS))
         
-        predictions['moving_average'] = self.moving_average(consumption_data)
-        predictions['exponential_smoothing'] = self.exponential_smoothing(consumption_data)
-        predictions['holt_winters'] = self.holt_winters(consumption_data)
-        predictions['arima'] = self.arima_simple(consumption_data)
+        preds[0] = self.moving_average(series)
+        preds[1] = self.exponential_smoothing(series)
+        preds[2] = self.holt_winters(series)
+        preds[3] = self.arima_simple(series)
         
         # Linear regression
-        lr_result = self.linear_regression_forecast(df)
-        predictions['linear_regression'] = lr_result['prediction']
+        lr_result = self.linear_regression_forecast(features, series.arr)
+        preds[4] = lr_result['prediction']
         
         # Seasonal decomposition
-        seasonal_result = self.seasonal_decomposition_forecast(consumption_data)
-        predictions['seasonal_decomposition'] = seasonal_result['prediction']
-        
-        # Calculate weights based on recent performance (simplified)
-        weights = {
-            'moving_average': 0.15,
-            'exponential_smoothing': 0.20,
-            'holt_winters': 0.25,
-            'linear_regression': 0.20,
-            'seasonal_decomposition': 0.15,
-            'arima': 0.05
-        }
+        seasonal_result = self.seasonal_decomposition_forecast(series)
+        preds[5] = seasonal_result['prediction']
         
         # Ensemble prediction
-        ensemble_prediction = sum(predictions[method] * weights[method] for method in predictions)
+        ensemble_prediction = float(preds @ ENSEMBLE_WEIGHTS)
         
         # Calculate prediction intervals
-        pred_values = list(predictions.values())
-        prediction_std = np.std(pred_values)
+        prediction_std = float(preds.std())
         
         return {
             'ensemble_prediction': ensemble_prediction,
-            'individual_predictions': predictions,
+            'individual_predictions': dict(zip(ENSEMBLE_METHODS, preds.tolist())),
             'confidence_interval': {
                 'lower': ensemble_prediction - 1.96 * prediction_std,
                 'upper': ensemble_prediction + 1.96 * prediction_std
             },
             'prediction_variance': prediction_std,
-            'algorithm_weights': weights,
+            'algorithm_weights': dict(zip(ENSEMBLE_METHODS, ENSEMBLE_WEIGHTS.tolist())),
             'linear_regression_details': lr_result,
             'seasonal_analysis': seasonal_result
         }
@@ -1,8 +1,19 @@
 import torch
 import torch.nn as nn
 import numpy as np
+import tempfile
+from pathlib import Path
+from typing import Tuple
 from sklearn.preprocessing import MinMaxScaler
 
+# Column order of the model input
+FEATURES = ['consumption', 'hour', 'dayofweek', 'month', 'dayofyear']
+
+# Training-time bounds of the calendar features (hour, dayofweek, month, dayofyear);
+# each PJM file the models were trained on spans full years, so its scaler saw all of them
+CALENDAR_MIN = np.array([0, 0, 1, 1], dtype=np.float32)
+CALENDAR_RANGE = np.array([23, 6, 11, 365], dtype=np.float32)
+
 class GRUNet(nn.Module):
     def __init__(self, input_dim, hidden_dim, output_dim, n_layers, drop_prob=0.2):
         super(GRUNet, self).__init__()
@@ -14,16 +25,20 @@ class GRUNet(nn.Module):
         )
         self.fc = nn.Linear(hidden_dim, output_dim)
         self.relu = nn.ReLU()
+        
+        # Zero hidden state for batch size 1, reused across predictions
+        self.register_buffer('_h0', torch.zeros(n_layers, 1, hidden_dim), persistent=False)
 
     def forward(self, x, h):
         out, h = self.gru(x, h)
         out = self.fc(self.relu(out[:, -1]))
         return out, h
 
-    def init_hidden(self, batch_size):
-        weight = next(self.parameters()).data
-        hidden = weight.new(self.n_layers, batch_size, self.hidden_dim).zero_()
-        return hidden
+    @torch.jit.export
+    def init_hidden(self, batch_size: int) -> torch.Tensor:
+        if batch_size == 1:
+            return self._h0
+        return self._h0.expand(-1, batch_size, -1).contiguous()
 
 class LSTMNet(nn.Module):
     def __init__(self, input_dim, hidden_dim, output_dim, n_layers, drop_prob=0.2):
@@ -36,17 +51,23 @@ class LSTMNet(nn.Module):
         )
         self.fc = nn.Linear(hidden_dim, output_dim)
         self.relu = nn.ReLU()
+        
+        # Zero hidden/cell state for batch size 1, reused across predictions
+        self.register_buffer('_h0', torch.zeros(n_layers, 1, hidden_dim), persistent=False)
+        self.register_buffer('_c0', torch.zeros(n_layers, 1, hidden_dim), persistent=False)
 
-    def forward(self, x, h):
+    def forward(self, x, h: Tuple[torch.Tensor, torch.Tensor]):
         out, h = self.lstm(x, h)
         out = self.fc(self.relu(out[:, -1]))
         return out, h
 
-    def init_hidden(self, batch_size):
-        weight = next(self.parameters()).data
+    @torch.jit.export
+    def init_hidden(self, batch_size: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        if batch_size == 1:
+            return (self._h0, self._c0)
         hidden = (
-            weight.new(self.n_layers, batch_size, self.hidden_dim).zero_(),
-            weight.new(self.n_layers, batch_size, self.hidden_dim).zero_(),
+            self._h0.expand(-1, batch_size, -1).contiguous(),
+            self._c0.expand(-1, batch_size, -1).contiguous(),
         )
         return hidden
 
@@ -62,79 +83,189 @@ class EnergyForecastingService:
         self.gru_model = GRUNet(self.input_dim, self.hidden_dim, self.output_dim, self.n_layers)
         self.lstm_model = LSTMNet(self.input_dim, self.hidden_dim, self.output_dim, self.n_layers)
         
-        # Initialize scalers
-        self.scaler = MinMaxScaler()
+        # ONNX Runtime session for the LSTM, created by load_models; None means serve
+        # via TorchScript. The GRU always uses TorchScript: onnxruntime has no
+        # quantized GRU kernel, so its ONNX recurrent layer would stay fp32
+        self.lstm_session = None
+        self._zero_state = np.zeros((self.n_layers, 1, self.hidden_dim), dtype=np.float32)
+        
+        # Training consumption bounds; fit it to scale inputs by them rather than by the input history
         self.label_scaler = MinMaxScaler()
         
     def load_models(self, gru_path=None, lstm_path=None):
         """Load trained models from file paths"""
+        # One intra-op thread per process; parallelism comes from uvicorn workers
+        torch.set_num_threads(1)
         try:
             if gru_path:
                 self.gru_model.load_state_dict(torch.load(gru_path, map_location='cpu'))
-                self.gru_model.eval()
+                self.gru_model = self._optimize_for_inference(self.gru_model)
             if lstm_path:
                 self.lstm_model.load_state_dict(torch.load(lstm_path, map_location='cpu'))
-                self.lstm_model.eval()
+                self.lstm_session = self._onnx_session(self.lstm_model, ['x', 'h', 'c'], ['out', 'h_n', 'c_n'])
+                self.lstm_model = self._optimize_for_inference(self.lstm_model)
         except Exception as e:
             print(f"Error loading models: {e}")
+        self.warmup()
+    
+    def warmup(self):
+        """Run one prediction per model so the first request doesn't pay one-off initialization costs"""
+        dummy_input = torch.zeros(1, self.window_size, self.input_dim)
+        self.predict_gru(dummy_input)
+        self.predict_lstm(dummy_input)
+    
+    def _onnx_session(self, model, input_names, output_names):
+        """Export the fp32 model to ONNX, quantize it to int8 and open an ONNX Runtime session
+
+        Only used for the LSTM, which onnxruntime quantizes to DynamicQuantizeLSTM.
+        """
+        try:
+            import onnxruntime as ort
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError:
+            print("onnxruntime not installed, serving with TorchScript")
+            return None
+        
+        model.eval()
+        dummy_x = torch.zeros(1, self.window_size, self.input_dim)
+        dynamic_axes = {'x': {0: 'batch'}}
+        dynamic_axes.update({name: {1: 'batch'} for name in input_names[1:]})
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                fp32_path = Path(tmp_dir) / 'model.onnx'
+                int8_path = Path(tmp_dir) / 'model.int8.onnx'
+                torch.onnx.export(
+                    model, (dummy_x, model.init_hidden(1)), str(fp32_path),
+                    input_names=input_names, output_names=output_names,
+                    dynamic_axes=dynamic_axes, opset_version=17, dynamo=False
+                )
+                quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+                
+                options = ort.SessionOptions()
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                options.intra_op_num_threads = 1
+                return ort.InferenceSession(str(int8_path), options, providers=['CPUExecutionProvider'])
+        except Exception as e:
+            print(f"ONNX export failed, serving with TorchScript: {e}")
+            return None
+    
+    def _optimize_for_inference(self, model):
+        """Quantize recurrent/linear weights to int8 and compile with TorchScript"""
+        model = torch.ao.quantization.quantize_dynamic(
+            model.eval(), {nn.GRU, nn.LSTM, nn.Linear}, dtype=torch.qint8
+        )
+        return torch.jit.script(model)
+    
+    def _to_array(self, data):
+        """Copy input rows (dicts keyed by FEATURES, or plain rows) into a float32 array"""
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            data = [[row[feature] for feature in FEATURES] for row in data]
+        return np.array(data, dtype=np.float32).reshape(-1, self.input_dim)
+    
+    def _consumption_bounds(self, consumption):
+        """Min/max used to scale consumption
+        
+        Training fit one MinMaxScaler per multi-year PJM file and those bounds were not
+        saved. If label_scaler has been fitted with them, they are used; otherwise the
+        whole input history stands in for the training series (as the original per-request
+        scaler did), which approximates but does not reproduce the training scaling.
+        """
+        if hasattr(self.label_scaler, 'data_min_'):
+            return float(self.label_scaler.data_min_[0]), float(self.label_scaler.data_max_[0])
+        return float(consumption.min()), float(consumption.max())
+    
+    def _scale_inplace(self, arr, consumption_min, consumption_max):
+        """Min/max scale arr in place: calendar features by their fixed training bounds,
+        consumption by the given bounds (a constant series maps to 0, as in MinMaxScaler)"""
+        calendar = arr[:, 1:]
+        np.subtract(calendar, CALENDAR_MIN, out=calendar)
+        np.divide(calendar, CALENDAR_RANGE, out=calendar)
+        
+        consumption = arr[:, 0]
+        consumption -= consumption_min
+        consumption /= (consumption_max - consumption_min) or 1
+        return arr
     
     def preprocess_data(self, data):
         """Preprocess input data for prediction"""
-        # Assuming data is a list of dictionaries with features
-        # Convert to numpy array and scale
-        if isinstance(data, list):
-            data = np.array(data)
-        
-        # Scale the data
-        scaled_data = self.scaler.fit_transform(data.reshape(-1, self.input_dim))
+        # Consumption bounds come from the full history; only the last window is
+        # converted (sliced before conversion, a view for arrays)
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            consumption = np.fromiter((row['consumption'] for row in data), dtype=np.float64, count=len(data))
+            window = data[-self.window_size:]
+        else:
+            rows = np.asarray(data).reshape(-1, self.input_dim)
+            consumption = rows[:, 0]
+            window = rows[-self.window_size:]
         
         # Create sequences for prediction
-        if len(scaled_data) >= self.window_size:
-            sequence = scaled_data[-self.window_size:].reshape(1, self.window_size, self.input_dim)
-            return torch.FloatTensor(sequence)
+        if len(window) >= self.window_size:
+            # One fresh float32 buffer, scaled in place and shared with the tensor
+            sequence = self._scale_inplace(self._to_array(window), *self._consumption_bounds(consumption))
+            return torch.from_numpy(sequence).unsqueeze(0)
         else:
             raise ValueError(f"Need at least {self.window_size} data points for prediction")
     
+    def _to_prediction(self, output):
+        """A float for a single sequence, else a list with one prediction per sequence"""
+        return output.item() if output.shape[0] == 1 else output.ravel().tolist()
+    
     def predict_gru(self, input_data):
         """Make prediction using GRU model"""
-        with torch.no_grad():
-            h = self.gru_model.init_hidden(1)
+        with torch.inference_mode():
+            h = self.gru_model.init_hidden(input_data.shape[0])
             output, _ = self.gru_model(input_data, h)
-            return output.item()
+            return self._to_prediction(output)
     
     def predict_lstm(self, input_data):
         """Make prediction using LSTM model"""
-        with torch.no_grad():
-            h = self.lstm_model.init_hidden(1)
+        batch_size = input_data.shape[0]
+        if self.lstm_session is not None:
+            state = self._zero_state if batch_size == 1 else np.zeros(
+                (self.n_layers, batch_size, self.hidden_dim), dtype=np.float32
+            )
+            output, _, _ = self.lstm_session.run(None, {'x': input_data.numpy(), 'h': state, 'c': state})
+            return self._to_prediction(output)
+        with torch.inference_mode():
+            h = self.lstm_model.init_hidden(batch_size)
             output, _ = self.lstm_model(input_data, h)
-            return output.item()
+            return self._to_prediction(output)
     
-    def generate_sample_data(self, hours=168):
-        """Generate sample data for demonstration"""
-        np.random.seed(42)
+    def _sample_columns(self, hours):
+        """Sample consumption (float64) and calendar columns, in FEATURES order"""
+        rng = np.random.default_rng(42)
+        i = np.arange(hours)
         
-        sample_data = []
-        for i in range(hours):
-            # Simulate energy consumption with daily and weekly patterns
-            hour_of_day = i % 24
-            day_of_week = (i // 24) % 7
-            
-            # Base consumption with daily pattern
-            base_consumption = 50 + 30 * np.sin(2 * np.pi * hour_of_day / 24) + np.random.normal(0, 5)
-            
-            # Weekend adjustment
-            if day_of_week >= 5:  # Weekend
-                base_consumption *= 0.8
-            
-            sample_data.append({
-                'consumption': max(0, base_consumption),
-                'hour': hour_of_day,
-                'dayofweek': day_of_week,
-                'month': 6,  # June
-                'dayofyear': 150 + i // 24
-            })
+        # Simulate energy consumption with daily and weekly patterns
+        hour_of_day = i % 24
+        day_of_week = (i // 24) % 7
         
-        return sample_data
+        # Base consumption with daily pattern
+        base_consumption = 50 + 30 * np.sin(2 * np.pi * hour_of_day / 24) + rng.standard_normal(hours) * 5
+        
+        # Weekend adjustment
+        base_consumption *= np.where(day_of_week >= 5, 0.8, 1.0)
+        
+        return (
+            np.maximum(base_consumption, 0),
+            hour_of_day,
+            day_of_week,
+            np.full(hours, 6),  # June
+            150 + i // 24,
+        )
+    
+    def generate_sample_array(self, hours=168):
+        """Generate sample data as an (hours, input_dim) float32 array in FEATURES order"""
+        sample = np.empty((hours, self.input_dim), dtype=np.float32)
+        for j, column in enumerate(self._sample_columns(hours)):
+            sample[:, j] = column
+        
+        return sample, {'features': FEATURES, 'hours': hours}
+    
+    def generate_sample_data(self, hours=168):
+        """Generate sample data for demonstration"""
+        columns = [column.tolist() for column in self._sample_columns(hours)]
+        return [dict(zip(FEATURES, row)) for row in zip(*columns)]
 
 # Global service instance
 forecasting_service = EnergyForecastingService()
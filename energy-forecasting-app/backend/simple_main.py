@@ -1,15 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
 import random
 import math
-import pandas as pd
+import numpy as np
 from dataset_generator import dataset_generator
 from forecasting_algorithms import forecasting_algorithms
 
-app = FastAPI(title="Energy Forecasting API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile/load the forecasting kernels before serving the first request
+    forecasting_algorithms.warmup()
+    yield
+
+app = FastAPI(title="Energy Forecasting API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -42,20 +50,32 @@ def generate_enhanced_sample_data(hours=168):
     """Generate enhanced realistic energy consumption data using dataset generator"""
     dataset_result = dataset_generator.generate_multiple_algorithms_data(hours)
     
-    # Convert to the expected format
-    sample_data = []
-    for record in dataset_result['historical_data']:
-        sample_data.append({
-            'consumption': round(record['consumption'], 2),
-            'hour': record['hour'],
-            'dayofweek': record['day_of_week'],
-            'month': record['month'],
-            'dayofyear': record['day_of_year'],
-            'temperature': round(record['temperature'], 1),
-            'humidity': round(record['humidity'], 1),
-            'season': record['season'],
-            'is_holiday': record['is_holiday']
-        })
+    # Convert the columnar output to the expected row format
+    columns = dataset_result['historical_data']
+    sample_data = [
+        {
+            'consumption': consumption,
+            'hour': hour,
+            'dayofweek': dayofweek,
+            'month': month,
+            'dayofyear': dayofyear,
+            'temperature': temperature,
+            'humidity': humidity,
+            'season': season,
+            'is_holiday': is_holiday
+        }
+        for consumption, hour, dayofweek, month, dayofyear, temperature, humidity, season, is_holiday in zip(
+            np.round(columns['consumption'], 2).tolist(),
+            columns['hour'].tolist(),
+            columns['day_of_week'].tolist(),
+            columns['month'].tolist(),
+            columns['day_of_year'].tolist(),
+            np.round(columns['temperature'], 1).tolist(),
+            np.round(columns['humidity'], 1).tolist(),
+            columns['season'].tolist(),
+            columns['is_holiday'].tolist()
+        )
+    ]
     
     return {
         'data': sample_data,
@@ -68,23 +88,19 @@ def enhanced_prediction(data, model_type="ensemble"):
     if len(data) < 10:
         raise ValueError("Need at least 10 data points for prediction")
     
-    # Convert to DataFrame for advanced algorithms
-    df_data = []
-    for point in data:
-        df_data.append({
-            'consumption': point.consumption,
-            'hour': point.hour,
-            'day_of_week': point.dayofweek,
-            'day_of_year': point.dayofyear,
-            'month': point.month,
-            'temperature': getattr(point, 'temperature', 20),  # Default temperature
-            'humidity': getattr(point, 'humidity', 50)  # Default humidity
-        })
-    
-    df = pd.DataFrame(df_data)
+    # Build the algorithm inputs as arrays, features ordered as LR_FEATURES
+    n = len(data)
+    consumption = np.fromiter((point.consumption for point in data), dtype=np.float64, count=n)
+    features = np.column_stack([
+        np.fromiter((point.hour for point in data), dtype=np.float64, count=n),
+        np.fromiter((point.dayofweek for point in data), dtype=np.float64, count=n),
+        np.fromiter((point.dayofyear for point in data), dtype=np.float64, count=n),
+        np.fromiter((getattr(point, 'temperature', 20) for point in data), dtype=np.float64, count=n),  # Default temperature
+        np.fromiter((getattr(point, 'humidity', 50) for point in data), dtype=np.float64, count=n)  # Default humidity
+    ])
     
     # Get ensemble prediction
-    ensemble_result = forecasting_algorithms.ensemble_forecast(df)
+    ensemble_result = forecasting_algorithms.ensemble_forecast(consumption, features)
     
     return ensemble_result
 
@@ -103,12 +119,13 @@ async def get_sample_data(hours: int = 168):
         # Set seed for consistent data
         random.seed(42)
         enhanced_data = generate_enhanced_sample_data(hours)
-        return {
+        # Returned directly so orjson encodes the NumPy values without a jsonable_encoder pass
+        return ORJSONResponse({
             "data": enhanced_data['data'], 
             "count": len(enhanced_data['data']),
             "statistics": enhanced_data['statistics'],
             "correlations": enhanced_data['correlations']
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The backend modules are imported as top-level scripts (see simple_main.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
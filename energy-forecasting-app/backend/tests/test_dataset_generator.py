@@ -0,0 +1,14 @@
+import pandas as pd
+import pytest
+
+from dataset_generator import EnergyDatasetGenerator
+
+
+@pytest.mark.parametrize('hours', [1, 3, 6, 30, 168, 24 * 30])
+def test_peak_hours_match_groupby_nlargest(hours):
+    data = EnergyDatasetGenerator(seed=hours).generate_multiple_algorithms_data(hours)
+
+    df = pd.DataFrame(data['historical_data'])
+    expected = df.groupby('hour')['consumption'].mean().nlargest(5).index.tolist()
+
+    assert data['statistics']['peak_hours'] == expected
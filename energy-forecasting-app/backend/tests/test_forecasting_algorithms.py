@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from forecasting_algorithms import forecasting_algorithms
+
+
+def _reference_holt_winters(data, season_length, alpha, beta, gamma):
+    level = np.mean(data[:season_length])
+    trend = (np.mean(data[season_length:2*season_length]) - np.mean(data[:season_length])) / season_length
+    seasonal = [data[i] - level for i in range(season_length)]
+
+    for i in range(season_length, len(data)):
+        prev_level = level
+        level = alpha * (data[i] - seasonal[i % season_length]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        seasonal[i % season_length] = gamma * (data[i] - level) + (1 - gamma) * seasonal[i % season_length]
+
+    return level + trend + seasonal[0]
+
+
+@pytest.mark.parametrize('hours, season_length', [(48, 24), (168, 24), (1000, 24), (90, 7)])
+def test_holt_winters_kernel_matches_reference_loop(hours, season_length):
+    rng = np.random.default_rng(hours)
+    i = np.arange(hours)
+    data = (100 + 30 * np.sin(2 * np.pi * i / season_length) + rng.normal(0, 5, hours)).tolist()
+
+    expected = _reference_holt_winters(data, season_length, 0.3, 0.1, 0.1)
+
+    assert forecasting_algorithms.holt_winters(data, season_length) == pytest.approx(expected, rel=1e-9)
+
+
+def test_linear_regression_matches_sklearn():
+    from sklearn.linear_model import LinearRegression
+
+    rng = np.random.default_rng(7)
+    n = 168
+    hour = np.arange(n) % 24
+    X = np.column_stack([
+        hour,
+        (np.arange(n) // 24) % 7,
+        150 + np.arange(n) // 24,
+        25 + rng.normal(0, 3, n),
+        60 + rng.normal(0, 10, n),
+    ]).astype(np.float64)
+    X[[5, 40], 3] = np.nan
+    y = 80 + 2 * X[:, 0] - 0.5 * np.nan_to_num(X[:, 3]) + rng.normal(0, 4, n)
+
+    result = forecasting_algorithms.linear_regression_forecast(X, y)
+
+    X_filled = np.where(np.isnan(X), np.nanmean(X, axis=0), X)
+    model = LinearRegression().fit(X_filled, y)
+    last_row = X_filled[-1:].copy()
+    last_row[0, 0] = (last_row[0, 0] + 1) % 24
+    assert result['prediction'] == pytest.approx(max(0, model.predict(last_row)[0]), rel=1e-9)
+    assert result['confidence'] == pytest.approx(model.score(X_filled, y), rel=1e-9)
+    np.testing.assert_allclose(list(result['feature_importance'].values()), model.coef_, rtol=1e-7, atol=1e-9)
@@ -0,0 +1,108 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from models import EnergyForecastingService, GRUNet, LSTMNet, forecasting_service
+
+CHECKPOINTS = Path(__file__).resolve().parents[3] / 'energy_consumption_prediction-master' / 'models'
+
+
+def _december_rows(consumption_level, hours=None):
+    hours = hours or forecasting_service.window_size
+    timestamps = pd.date_range('2023-12-01', periods=hours, freq='h')
+    rng = np.random.default_rng(0)
+    return [
+        {
+            'consumption': consumption_level + rng.normal(0, consumption_level * 0.05),
+            'hour': ts.hour,
+            'dayofweek': ts.dayofweek,
+            'month': ts.month,
+            'dayofyear': ts.dayofyear,
+        }
+        for ts in timestamps
+    ]
+
+
+def test_preprocess_scales_consumption_by_full_history_bounds():
+    window = forecasting_service.window_size
+    rows = _december_rows(12000, hours=3 * window)
+    # Put the history's extremes outside the window that gets scaled
+    rows[0]['consumption'] = 20000.0
+    rows[1]['consumption'] = 5000.0
+
+    scaled = forecasting_service.preprocess_data(rows)[0, :, 0].numpy()
+
+    window_consumption = np.array([row['consumption'] for row in rows[-window:]])
+    np.testing.assert_allclose(scaled, (window_consumption - 5000.0) / 15000.0, rtol=1e-5)
+
+
+def test_preprocess_scales_consumption_by_fitted_label_scaler():
+    service = EnergyForecastingService()
+    service.label_scaler.fit([[1000.0], [30000.0]])
+    rows = _december_rows(12000)
+
+    scaled = service.preprocess_data(rows)[0, :, 0].numpy()
+
+    consumption = np.array([row['consumption'] for row in rows])
+    np.testing.assert_allclose(scaled, (consumption - 1000.0) / 29000.0, rtol=1e-5)
+
+
+def test_preprocess_uses_fixed_calendar_bounds():
+    rows = _december_rows(50)
+    scaled = forecasting_service.preprocess_data(rows)[0, -1].numpy()
+
+    last = rows[-1]
+    np.testing.assert_allclose(
+        scaled[1:],
+        [last['hour'] / 23, last['dayofweek'] / 6, (12 - 1) / 11, (last['dayofyear'] - 1) / 365],
+        rtol=1e-6,
+    )
+
+
+def test_preprocess_does_not_modify_input_array():
+    sample, _ = forecasting_service.generate_sample_array()
+    original = sample.copy()
+
+    forecasting_service.preprocess_data(sample)
+
+    np.testing.assert_array_equal(sample, original)
+
+
+@pytest.mark.parametrize('model_cls, checkpoint', [(GRUNet, 'gru_model.pt'), (LSTMNet, 'lstm_model.pt')])
+def test_int8_torchscript_stays_close_to_fp32(model_cls, checkpoint):
+    service = forecasting_service
+    model = model_cls(service.input_dim, service.hidden_dim, service.output_dim, service.n_layers)
+    model.load_state_dict(torch.load(CHECKPOINTS / checkpoint, map_location='cpu'))
+    model.eval()
+    quantized = service._optimize_for_inference(copy.deepcopy(model))
+
+    sample, _ = service.generate_sample_array(24 * 30)
+    windows = [service.preprocess_data(sample[:end]) for end in range(service.window_size, len(sample), 60)]
+    x = torch.cat(windows + [service.preprocess_data(_december_rows(12000, hours=300))])
+    with torch.inference_mode():
+        expected, _ = model(x, model.init_hidden(x.shape[0]))
+        actual, _ = quantized(x, quantized.init_hidden(x.shape[0]))
+
+    # Outputs are scaled consumption in [0, 1]; int8 weights move them by up to ~0.01,
+    # which is several percent relative for low-load predictions
+    np.testing.assert_allclose(actual.numpy(), expected.numpy(), rtol=0, atol=0.02)
+
+
+def test_lstm_onnx_session_predicts_batches():
+    service = EnergyForecastingService()
+    service.load_models(lstm_path=CHECKPOINTS / 'lstm_model.pt')
+    if service.lstm_session is None:
+        pytest.skip('onnxruntime not available')
+
+    sample, _ = service.generate_sample_array(24 * 10)
+    x = torch.cat([service.preprocess_data(sample[:end]) for end in (120, 180, 240)])
+
+    batched = service.predict_lstm(x)
+
+    assert len(batched) == 3
+    # Dynamic quantization picks one activation scale per batch, so results shift slightly
+    np.testing.assert_allclose(batched, [service.predict_lstm(row[None]) for row in x], rtol=0, atol=0.01)